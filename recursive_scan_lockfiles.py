@@ -1,6 +1,12 @@
+import contextlib
+import io
 import os
 import sys
-import subprocess
+from concurrent.futures import ProcessPoolExecutor
+
+from src.cli import main as cli_main
+from src.services.badlist_fetcher import get_badlist, set_badlist
+from src.utils.logger import log
 
 
 def find_directories_with_package_lock(root_dir, max_depth=2):
@@ -14,36 +20,95 @@ def find_directories_with_package_lock(root_dir, max_depth=2):
         if depth > max_depth:
             return
 
+        has_lock = False
+        subdirs = []
         try:
-            entries = os.listdir(current_dir)
+            with os.scandir(current_dir) as it:
+                for entry in it:
+                    if entry.name == b"package-lock.json":
+                        has_lock = True
+                    elif entry.name != b"node_modules" and entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
         except PermissionError:
             return
 
-        if "package-lock.json" in entries:
-            result.append(current_dir)
+        if has_lock:
+            result.append(os.fsdecode(current_dir))
 
-        for entry in entries:
-            path = os.path.join(current_dir, entry)
-            if os.path.isdir(path) and entry != "node_modules":
-                recurse(path, depth + 1)
+        for path in subdirs:
+            recurse(path, depth + 1)
 
-    recurse(root_dir, 0)
+    # Walk with bytes paths so entry names are never decoded; only
+    # the directories returned to the caller are
+    recurse(os.fsencode(root_dir), 0)
     return result
 
 
+def run_scanner(directory):
+    """
+    Run the scanner CLI in-process for a single directory.
+    Returns the exit code the CLI would have exited with.
+    """
+    saved_argv = sys.argv
+    sys.argv = ["shai-hulud-scanner", "--dir", directory]
+    log.verbose = False
+    try:
+        cli_main()
+    except SystemExit as e:
+        if e.code is None:
+            return 0
+        return e.code if isinstance(e.code, int) else 1
+    finally:
+        sys.argv = saved_argv
+    return 0
+
+
+def _init_worker(bad_packages):
+    """Share the badlist fetched by the parent with each worker process."""
+    if bad_packages is not None:
+        set_badlist(bad_packages)
+
+
+def _scan_one(directory):
+    """
+    Scan one directory, capturing its report and errors so the parent can
+    print them without interleaving them with other workers' reports.
+    """
+    output = io.StringIO()
+    errors = io.StringIO()
+    with contextlib.redirect_stdout(output), contextlib.redirect_stderr(errors):
+        returncode = run_scanner(directory)
+    return directory, returncode, output.getvalue(), errors.getvalue()
+
+
 def process_directories(directories):
     """
-    Run `python3 -m src.cli --dir <dir>` for each directory until one fails.
+    Run the scanner for each directory in parallel worker processes.
+    Returns a list of (directory, exit code) for the directories that failed.
     """
+    workers = os.cpu_count() or 1
+    chunksize = max(1, len(directories) // (4 * workers))
+    try:
+        bad_packages = get_badlist()
+    except Exception:
+        # Let each scan report the failure itself
+        bad_packages = None
+
     total = len(directories)
-    for idx, d in enumerate(directories, start=1):
-        print(f"[{idx}/{total}] Processing {d}...")
-        result = subprocess.run([
-            sys.executable, "-m", "src.cli", "--dir", d
-        ])
-        if result.returncode != 0:
-            print(f"Command failed in {d} with exit code {result.returncode}")
-            sys.exit(result.returncode)
+    failures = []
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(bad_packages,)
+    ) as executor:
+        results = executor.map(_scan_one, directories, chunksize=chunksize)
+        for idx, (d, returncode, output, errors) in enumerate(results, start=1):
+            print(f"[{idx}/{total}] Processing {d}...")
+            print(output, end="", flush=True)
+            print(errors, end="", file=sys.stderr, flush=True)
+            if returncode != 0:
+                failures.append((d, returncode))
+    return failures
 
 
 def main():
@@ -63,7 +128,12 @@ def main():
         print("No directories with package-lock.json found.")
         return
 
-    process_directories(directories)
+    failures = process_directories(directories)
+    if failures:
+        for d, returncode in failures:
+            print(f"Command failed in {d} with exit code {returncode}")
+        sys.exit(failures[0][1])
+
     print("All directories processed successfully.")
 
 
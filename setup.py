@@ -37,6 +37,12 @@ setup(
     packages=find_packages(),
     python_requires=">=3.8",
     install_requires=requirements,
+    extras_require={
+        "git": ["pygit2>=1.12"],
+        "fast": ["scandir-rs>=2.4", "orjson>=3.9"],
+        "yaml": ["pyyaml>=6.0"],
+        "stream": ["ijson>=3.2"],
+    },
     entry_points={
         "console_scripts": [
             "shai-hulud-scanner=src.cli:main",
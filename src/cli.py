@@ -9,14 +9,13 @@ import os
 import sys
 import time
 from pathlib import Path
-from colorama import Fore, Style
 
 from .services.badlist_fetcher import get_badlist
 from .scanners.dependency_scanner import scan_dependencies
 from .scanners.file_scanner import scan_files
 from .scanners.github_scanner import scan_github
 from .scanners.git_scanner import scan_git_repository
-from .utils.logger import log
+from .utils.logger import log, Fore, Style, INF, SUCCESS, ERR
 from .utils.ui import (
     create_header,
     create_results_section,
@@ -41,7 +40,8 @@ def main():
     )
     parser.add_argument(
         '-g', '--github-token',
-        help='GitHub token for org scan (optional)'
+        default=os.environ.get('GITHUB_TOKENS'),
+        help='GitHub token(s) for org scan, comma-separated (default: $GITHUB_TOKENS)'
     )
     parser.add_argument(
         '-o', '--org',
@@ -52,6 +52,16 @@ def main():
         action='store_true',
         help='Skip local git repository scan'
     )
+    parser.add_argument(
+        '--cache-node-modules',
+        action='store_true',
+        help='Reuse node_modules results while lockfiles and node_modules are unchanged (misses edits inside installed packages)'
+    )
+    parser.add_argument(
+        '--cache-github',
+        action='store_true',
+        help="Reuse GitHub results while the org's most recently pushed and updated repos are unchanged (misses changes that touch neither)"
+    )
     parser.add_argument(
         '--remediate',
         action='store_true',
@@ -113,8 +123,15 @@ def main():
         'totalIssues': 0
     }
     
+    # List the top-level directory once and share it with the scanners
+    try:
+        with os.scandir(directory) as it:
+            top_entries = {entry.name: entry for entry in it}
+    except OSError:
+        top_entries = {}
+    
     # Check if it's a git repository
-    is_git_repo = os.path.exists(os.path.join(directory, '.git'))
+    is_git_repo = '.git' in top_entries
     
     if not is_json:
         # Show clean header
@@ -128,19 +145,19 @@ def main():
         bad_packages = get_badlist()
         
         # Run scanners
-        dep_results = scan_dependencies(directory, bad_packages, is_json)
+        dep_results = scan_dependencies(directory, bad_packages, is_json, top_entries=top_entries)
         results['badDeps'] = dep_results['badDeps']
         results['totalScanned'] = dep_results['totalScanned']
         results['totalIssues'] += len(results['badDeps'])
         
-        file_results = scan_files(directory, is_json)
+        file_results = scan_files(directory, is_json, top_entries=top_entries, use_cache=args.cache_node_modules)
         results['suspiciousFiles'] = file_results['suspiciousFiles']
         results['suspiciousScripts'] = file_results['suspiciousScripts']
         results['totalIssues'] += len(results['suspiciousFiles']) + len(results['suspiciousScripts'])
         
         # Local git repository scan (no API required)
         if not args.skip_git:
-            git_results = scan_git_repository(directory, is_json)
+            git_results = scan_git_repository(directory, is_json, is_git_repo=is_git_repo)
             results['gitIssues'] = git_results['gitIssues']
             if 'gitError' in git_results:
                 results['gitError'] = git_results['gitError']
@@ -148,7 +165,7 @@ def main():
         
         # Optional GitHub organization scan (requires PAT)
         if args.github_token and args.org:
-            github_results = scan_github(args.github_token, args.org, is_json)
+            github_results = scan_github(args.github_token, args.org, is_json, use_cache=args.cache_github)
             results['githubIssues'] = github_results['githubIssues']
             if 'githubError' in github_results:
                 results['githubError'] = github_results['githubError']
@@ -178,18 +195,18 @@ def main():
                     import subprocess
                     subprocess.run(['npm', 'uninstall'] + [dep['name'] for dep in results['badDeps']], 
                                  cwd=directory, check=True)
-                    print(f"{Fore.GREEN}[INF]{Style.RESET_ALL} Bad dependencies uninstalled successfully")
+                    print(f"{SUCCESS}Bad dependencies uninstalled successfully")
                     
                     # Show post-remediation summary
-                    print(f"{Fore.GREEN}[INF]{Style.RESET_ALL} Remediation complete - removed {remediated_count} compromised packages")
-                    print(f"{Fore.GREEN}[INF]{Style.RESET_ALL} Project dependencies cleaned successfully")
-                    print(f"{Fore.BLUE}[INF]{Style.RESET_ALL} Next: run 'npm install' to reinstall clean dependencies")
-                    print(f"{Fore.BLUE}[INF]{Style.RESET_ALL} Consider running 'npm audit' for additional security checks")
+                    print(f"{SUCCESS}Remediation complete - removed {remediated_count} compromised packages")
+                    print(f"{SUCCESS}Project dependencies cleaned successfully")
+                    print(f"{INF}Next: run 'npm install' to reinstall clean dependencies")
+                    print(f"{INF}Consider running 'npm audit' for additional security checks")
                     
                     # Exit successfully after remediation
                     sys.exit(0)
                 except subprocess.CalledProcessError as error:
-                    print(f"{Fore.RED}[ERR]{Style.RESET_ALL} Remediation failed: {error}")
+                    print(f"{ERR}Remediation failed: {error}")
         
         # Show summary and recommendations
         print(create_summary(results, duration))
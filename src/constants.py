@@ -3,17 +3,58 @@
 Constants for Shai-Hulud Scanner
 """
 
+import os
 import re
+from pathlib import Path
 
 # Known malicious bundle.js hash from Shai-Hulud worm
 BUNDLE_HASH = "46faab8ab153fae6e80e7cca38eab363075bb524edd79e42269217a083628f09"
 
+# Exact byte size of the malicious bundle.js (None disables the size precheck)
+BUNDLE_SIZE = None
+
 # Suspicious postinstall script patterns
 SUSPICIOUS_POSTINSTALL = re.compile(r"(node\s+bundle\.js|trufflehog|webhook\.site|exfiltrat)", re.IGNORECASE)
 
 # Suspicious IOCs (Indicators of Compromise)
 SUSPICIOUS_IOCS = re.compile(r"(webhook\.site|bb8ca5f6-4175-45d2-b042-fc9ebb8170b7|shai-hulud|trufflehog)", re.IGNORECASE)
 
+# GitHub personal/OAuth access tokens
+GITHUB_TOKEN = re.compile(r"gh[po]_[a-zA-Z0-9]{36}")
+
+# IOCs and GitHub tokens in a single pass (dispatch on match.lastgroup)
+SUSPICIOUS_CONTENT = re.compile(
+    rf"(?P<ioc>(?i:{SUSPICIOUS_IOCS.pattern}))|(?P<tok>{GITHUB_TOKEN.pattern})"
+)
+
+# Same as SUSPICIOUS_CONTENT, for scanning raw file bytes
+SUSPICIOUS_CONTENT_BYTES = re.compile(SUSPICIOUS_CONTENT.pattern.encode())
+
+# Suspicious commit message patterns ("add.*bundle.js" only flags actually adding bundle.js)
+SUSPICIOUS_COMMIT = re.compile(
+    r"(shai-hulud|add.*bundle\.js|postinstall.*malicious|trufflehog|webhook\.site|exfiltrat|malicious.*package|backdoor)",
+    re.IGNORECASE
+)
+
+# Suspicious file names in recent git history (postinstall only together with .js)
+SUSPICIOUS_GIT_FILE = re.compile(
+    r"(bundle\.js|shai-hulud|malware|backdoor|postinstall.*\.js|\.js.*postinstall)",
+    re.IGNORECASE
+)
+
+# Suspicious local branch names ("migration" only together with a worm indicator)
+SUSPICIOUS_BRANCH = re.compile(
+    r"(shai-hulud|exfiltrate|malware|backdoor)|^(?=.*migration).*(shai|hulud|worm|malicious)",
+    re.IGNORECASE
+)
+
+# Suspicious GitHub repository names (worm "-migration" forks)
+SUSPICIOUS_REPO = re.compile(r"-migration|\AShai-Hulud\Z")
+
+# Branch the worm pushes to GitHub repos, and the workflow file it adds
+SUSPICIOUS_GITHUB_BRANCH = 'shai-hulud'
+SUSPICIOUS_GITHUB_WORKFLOW = 'shai-hulud-workflow.yml'
+
 # Scanner version
 VERSION = "1.1.0"
 
@@ -23,5 +64,11 @@ DEFAULT_BADLIST_URL = "https://raw.githubusercontent.com/Amruth-SV/shai-hulud-sc
 # Timeout for HTTP requests (seconds)
 HTTP_TIMEOUT = 10
 
+# Per-user cache directory for the affected list and scan results
+CACHE_DIR = Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache') / 'shai-hulud'
+
+# How long a cached affected list is used before refetching (seconds)
+BADLIST_CACHE_TTL = 60 * 60  # 1 hour
+
 # Maximum file size to scan (bytes)
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
@@ -6,17 +6,19 @@ Dependency scanner for Shai-Hulud Scanner
 import json
 import os
 from pathlib import Path
+from ..services.badlist_fetcher import BadList
 from ..utils.lockfile_parser import parse_lockfile, clean_version
 from ..utils.logger import log
 
-def scan_dependencies(directory, bad_packages, is_json=False):
+def scan_dependencies(directory, bad_packages, is_json=False, top_entries=None):
     """
     Scans dependencies for bad packages.
     
     Args:
         directory (str): Project directory
-        bad_packages (dict): Badlist dictionary
+        bad_packages (BadList): Indexed badlist (a plain badlist dictionary is indexed here)
         is_json (bool): JSON mode
+        top_entries (dict): Optional {name: os.DirEntry} listing of directory
     
     Returns:
         dict: Results with badDeps and totalScanned
@@ -26,6 +28,9 @@ def scan_dependencies(directory, bad_packages, is_json=False):
     # Parse package.json
     dependencies = {}
     try:
+        if top_entries is not None and 'package.json' not in top_entries:
+            raise FileNotFoundError('package.json')
+        
         pkg_path = Path(directory) / 'package.json'
         with open(pkg_path, 'r', encoding='utf-8') as f:
             pkg = json.load(f)
@@ -41,14 +46,24 @@ def scan_dependencies(directory, bad_packages, is_json=False):
     # Count direct dependencies
     direct_deps_count = len(dependencies)
     
+    # Bad versions as sets for constant-time membership checks
+    if not isinstance(bad_packages, BadList):
+        bad_packages = BadList.from_raw(bad_packages)
+    bad_index = bad_packages.index
+    
+    # (name, version) pairs already reported
+    seen = set()
+    
     # Check direct dependencies
     for name, version in dependencies.items():
         cleaned_version = clean_version(version)
-        if name in bad_packages and cleaned_version in bad_packages[name]:
+        bad_versions = bad_index.get(name)
+        if bad_versions and cleaned_version in bad_versions:
             results['badDeps'].append({'name': name, 'version': cleaned_version})
+            seen.add((name, cleaned_version))
     
     # Check lockfile (ALL packages, not just those in package.json)
-    lockfile_deps = parse_lockfile(directory)
+    lockfile_deps = parse_lockfile(directory, top_entries=top_entries)
     unique_lockfile_deps = set()
     
     for dep in lockfile_deps:
@@ -56,9 +71,11 @@ def scan_dependencies(directory, bad_packages, is_json=False):
         version = dep['version']
         unique_lockfile_deps.add(name)
         
-        if name in bad_packages and version in bad_packages[name]:
+        bad_versions = bad_index.get(name)
+        if bad_versions and version in bad_versions:
             # Always add vulnerable packages from lockfile, regardless of package.json
-            if not any(d['name'] == name and d['version'] == version for d in results['badDeps']):
+            if (name, version) not in seen:
+                seen.add((name, version))
                 results['badDeps'].append({'name': name, 'version': version})
     
     # Total scanned = direct deps + unique lockfile deps (transitive)
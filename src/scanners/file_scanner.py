@@ -6,19 +6,222 @@ File scanner for Shai-Hulud Scanner
 import hashlib
 import json
 import os
-import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from glob import glob
-from ..constants import BUNDLE_HASH, SUSPICIOUS_POSTINSTALL, SUSPICIOUS_IOCS, MAX_FILE_SIZE
+from ..constants import (
+    BUNDLE_HASH, BUNDLE_SIZE, SUSPICIOUS_POSTINSTALL, SUSPICIOUS_CONTENT_BYTES, MAX_FILE_SIZE,
+    CACHE_DIR
+)
 from ..utils.logger import log
 
-def scan_files(directory, is_json=False):
+try:
+    from scandir_rs import ReturnType, Walk
+except ImportError:  # Optional, install with the "fast" extra
+    Walk = None
+
+# File checks are I/O-bound, so threads overlap the open/read syscalls
+MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+def _walk_node_modules(node_modules):
+    """
+    Yields (root, files) for each directory under node_modules, skipping .bin.
+    Uses the native scandir_rs walker when installed, else os.walk; both list
+    the same files, including symlinks to files and special files.
+    """
+    if Walk is not None:
+        base = str(node_modules)
+        for root, _, files, symlinks, other, _ in Walk(base, follow_links=False, return_type=ReturnType.Ext):
+            # scandir_rs yields roots relative to the walked directory
+            if '.bin' in root.split(os.sep):
+                continue
+            root = os.path.join(base, root)
+            
+            # os.walk lists every entry that is not a directory (following
+            # symlinks) as a file, without descending into linked directories
+            files.extend(name for name in symlinks if not os.path.isdir(os.path.join(root, name)))
+            files.extend(other)
+            yield root, files
+        return
+    
+    for root, dirs, files in os.walk(node_modules):
+        dirs[:] = [d for d in dirs if d != '.bin']
+        yield root, files
+
+def _sha256_file(file_path):
+    """Hash a file without reading it into memory in one go"""
+    with open(file_path, 'rb') as f:
+        if hasattr(hashlib, 'file_digest'):  # Python 3.11+
+            return hashlib.file_digest(f, 'sha256').hexdigest()
+        
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+        return digest.hexdigest()
+
+def _scan_bundle(file_path):
+    """
+    Checks a bundle.js file against the known malicious hash.
+    Returns an issue dict or None.
+    """
+    try:
+        file_size = Path(file_path).stat().st_size
+        if file_size > MAX_FILE_SIZE:
+            return None  # Skip very large files
+        if BUNDLE_SIZE is not None and file_size != BUNDLE_SIZE:
+            return None  # Cannot match the known bundle
+        
+        file_hash = _sha256_file(file_path)
+        if file_hash == BUNDLE_HASH:
+            return {
+                'type': 'bundle.js',
+                'path': file_path,
+                'hash': file_hash
+            }
+    except (OSError, IOError):
+        # Skip unreadable files
+        pass
+    return None
+
+def _scan_pkg(file_path):
+    """
+    Checks a package.json file for suspicious scripts and IOCs.
+    Returns a (suspiciousFiles, suspiciousScripts) tuple of lists.
+    """
+    suspicious_files = []
+    suspicious_scripts = []
+    
+    try:
+        with open(file_path, 'rb') as f:
+            content = f.read()
+        
+        # Check for suspicious IOCs and GitHub tokens in the raw bytes
+        ioc_match = None
+        has_token = False
+        for match in SUSPICIOUS_CONTENT_BYTES.finditer(content):
+            if match.lastgroup == 'ioc':
+                ioc_match = ioc_match or match
+            else:
+                has_token = True
+            if ioc_match and has_token:
+                break
+        
+        # Only parse the JSON when there is something to inspect
+        has_postinstall = b'"postinstall"' in content
+        if not (ioc_match or has_token or has_postinstall):
+            return suspicious_files, suspicious_scripts
+        
+        pkg = json.loads(content)
+        
+        # Check postinstall scripts
+        scripts = pkg.get('scripts', {})
+        postinstall = scripts.get('postinstall', '')
+        if postinstall and SUSPICIOUS_POSTINSTALL.search(postinstall):
+            suspicious_scripts.append({
+                'path': file_path,
+                'script': postinstall
+            })
+        
+        if ioc_match:
+            suspicious_files.append({
+                'type': 'IOC',
+                'path': file_path,
+                'details': ioc_match.group(0).decode('utf-8', 'replace'),
+                'packageName': pkg.get('name', 'unknown')
+            })
+        
+        # Additional check for actual GitHub tokens (not just any ghp_ pattern)
+        if has_token:
+            # Only flag if it's not in a comment or documentation field
+            is_in_documentation = (
+                b'description' in content and b'example' in content or
+                b'readme' in content or
+                b'documentation' in content
+            )
+            
+            if not is_in_documentation:
+                suspicious_files.append({
+                    'type': 'GitHub-Token',
+                    'path': file_path,
+                    'details': 'Potential GitHub token detected',
+                    'packageName': pkg.get('name', 'unknown')
+                })
+    
+    except (json.JSONDecodeError, OSError, IOError):
+        # Skip invalid JSON or unreadable files
+        pass
+    
+    return suspicious_files, suspicious_scripts
+
+# Cached scan results, one file per project state
+SCAN_CACHE_DIR = CACHE_DIR / 'scans'
+
+# Lockfiles whose contents identify the installed node_modules tree
+LOCKFILES = ('package-lock.json', 'yarn.lock', 'pnpm-lock.yaml')
+
+# Everything the file checks match against, so detection updates invalidate
+# earlier cached results
+DETECTION_KEY = '\0'.join(map(str, (
+    BUNDLE_HASH, BUNDLE_SIZE, MAX_FILE_SIZE,
+    SUSPICIOUS_POSTINSTALL.pattern, SUSPICIOUS_POSTINSTALL.flags,
+    SUSPICIOUS_CONTENT_BYTES.pattern, SUSPICIOUS_CONTENT_BYTES.flags,
+)))
+
+def _scan_cache_path(directory, node_modules):
+    """
+    Returns the cache file for this project's current state, or None if it has
+    no lockfile. The key covers the detection patterns, the project path, every
+    lockfile's content and the node_modules mtime, so installs invalidate it.
+    Files changed inside installed packages do not, hence the cache is opt-in.
+    """
+    digest = hashlib.sha256(f"{DETECTION_KEY}\0{directory}".encode())
+    newest_lockfile = None
+    for name in LOCKFILES:
+        lockfile = Path(directory) / name
+        try:
+            digest.update(name.encode() + b'\0' + lockfile.read_bytes())
+            mtime = lockfile.stat().st_mtime
+        except OSError:
+            continue
+        newest_lockfile = max(newest_lockfile or mtime, mtime)
+    
+    if newest_lockfile is None:
+        return None
+    
+    digest.update(str(node_modules.stat().st_mtime_ns).encode())
+    return SCAN_CACHE_DIR / f"{digest.hexdigest()}.json", newest_lockfile
+
+def _load_scan_cache(cache_path, newest_lockfile):
+    """Loads cached results if present and newer than every lockfile"""
+    try:
+        if cache_path.stat().st_mtime < newest_lockfile:
+            return None
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        return {
+            'suspiciousFiles': cached['suspiciousFiles'],
+            'suspiciousScripts': cached['suspiciousScripts']
+        }
+    except (json.JSONDecodeError, OSError, KeyError, TypeError):
+        return None
+
+def _save_scan_cache(cache_path, results):
+    try:
+        SCAN_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(cache_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f)
+    except OSError as e:
+        log.debug(f"Failed to cache scan results: {e}")
+
+def scan_files(directory, is_json=False, top_entries=None, use_cache=False):
     """
     Scans files for bundle.js hash and suspicious scripts/IOCs.
     
     Args:
         directory (str): Project directory
         is_json (bool): JSON mode
+        top_entries (dict): Optional {name: os.DirEntry} listing of directory
+        use_cache (bool): Reuse results from an earlier scan with the same lockfiles
+            and node_modules directory (misses edits inside installed packages)
     
     Returns:
         dict: Results with suspiciousFiles and suspiciousScripts
@@ -26,93 +229,45 @@ def scan_files(directory, is_json=False):
     results = {'suspiciousFiles': [], 'suspiciousScripts': []}
     node_modules = Path(directory) / 'node_modules'
     
-    if not node_modules.exists():
+    if top_entries is not None:
+        has_node_modules = 'node_modules' in top_entries and top_entries['node_modules'].is_dir()
+    else:
+        has_node_modules = node_modules.exists()
+    
+    if not has_node_modules:
         # Silently return - UI will handle this
         return results
     
-    # Scan bundle.js hash
-    js_files = glob(str(node_modules / '**/bundle.js'), recursive=True)
-    for file_path in js_files:
-        try:
-            file_path_obj = Path(file_path)
-            if file_path_obj.stat().st_size > MAX_FILE_SIZE:
-                continue  # Skip very large files
-            
-            with open(file_path, 'rb') as f:
-                content = f.read()
-            
-            file_hash = hashlib.sha256(content).hexdigest()
-            if file_hash == BUNDLE_HASH:
-                issue = {
-                    'type': 'bundle.js',
-                    'path': file_path,
-                    'hash': file_hash
-                }
+    cache_key = _scan_cache_path(directory, node_modules) if use_cache else None
+    if cache_key:
+        cached = _load_scan_cache(*cache_key)
+        if cached is not None:
+            log.debug('Using cached node_modules scan results')
+            return cached
+    
+    # Collect bundle.js and package.json files in a single traversal
+    js_files = []
+    pkg_files = []
+    for root, files in _walk_node_modules(node_modules):
+        for name in files:
+            if name == 'bundle.js':
+                js_files.append(os.path.join(root, name))
+            elif name == 'package.json':
+                pkg_files.append(os.path.join(root, name))
+    
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        # Scan bundle.js hash
+        for issue in executor.map(_scan_bundle, js_files):
+            if issue:
                 results['suspiciousFiles'].append(issue)
-                # Silently add to results - UI will handle display
-        except (OSError, IOError):
-            # Skip unreadable files
-            continue
+        
+        # Scan package.json for scripts and IOCs
+        for files_found, scripts_found in executor.map(_scan_pkg, pkg_files):
+            results['suspiciousFiles'].extend(files_found)
+            results['suspiciousScripts'].extend(scripts_found)
     
-    # Scan package.json for scripts and IOCs
-    pkg_files = glob(str(node_modules / '**/package.json'), recursive=True)
-    for file_path in pkg_files:
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                pkg = json.load(f)
-            
-            has_issue = False
-            
-            # Check postinstall scripts
-            scripts = pkg.get('scripts', {})
-            postinstall = scripts.get('postinstall', '')
-            if postinstall and SUSPICIOUS_POSTINSTALL.search(postinstall):
-                results['suspiciousScripts'].append({
-                    'path': file_path,
-                    'script': postinstall
-                })
-                has_issue = True
-                # Silently add to results - UI will handle display
-            
-            # Check for suspicious IOCs in package content
-            content = json.dumps(pkg)
-            ioc_match = SUSPICIOUS_IOCS.search(content)
-            if ioc_match:
-                results['suspiciousFiles'].append({
-                    'type': 'IOC',
-                    'path': file_path,
-                    'details': ioc_match.group(0),
-                    'packageName': pkg.get('name', 'unknown')
-                })
-                has_issue = True
-                # Silently add to results - UI will handle display
-            
-            # Additional check for actual GitHub tokens (not just any ghp_ pattern)
-            token_pattern = re.compile(r'ghp_[a-zA-Z0-9]{36}|gho_[a-zA-Z0-9]{36}')
-            token_matches = token_pattern.findall(content)
-            if token_matches:
-                # Only flag if it's not in a comment or documentation field
-                is_in_documentation = (
-                    'description' in content and 'example' in content or
-                    'readme' in content or
-                    'documentation' in content
-                )
-                
-                if not is_in_documentation:
-                    results['suspiciousFiles'].append({
-                        'type': 'GitHub-Token',
-                        'path': file_path,
-                        'details': 'Potential GitHub token detected',
-                        'packageName': pkg.get('name', 'unknown')
-                    })
-                    has_issue = True
-                    # Silently add to results - UI will handle display
-            
-            if has_issue and not is_json:
-                pass  # Already logged
-                
-        except (json.JSONDecodeError, OSError, IOError):
-            # Skip invalid JSON or unreadable files
-            continue
+    if cache_key:
+        _save_scan_cache(cache_key[0], results)
     
+    # Results will be displayed in the main UI
     return results
@@ -3,19 +3,146 @@
 Git scanner for Shai-Hulud Scanner
 """
 
+import asyncio
 import os
-import re
-import subprocess
+import time
 from pathlib import Path
+from ..constants import SUSPICIOUS_BRANCH, SUSPICIOUS_COMMIT, SUSPICIOUS_GIT_FILE
 from ..utils.logger import log
 
-def scan_git_repository(directory, is_json=False):
+try:
+    import pygit2
+except ImportError:  # Optional, install with the "git" extra
+    pygit2 = None
+
+# How far back to look for suspicious files added to the repository
+RECENT_FILES_WINDOW = 30 * 24 * 60 * 60  # 30 days
+
+# Pathspec form of SUSPICIOUS_GIT_FILE, so git filters the name-only log itself
+SUSPICIOUS_GIT_PATHSPECS = [
+    ':(icase)*bundle.js*',
+    ':(icase)*shai-hulud*',
+    ':(icase)*malware*',
+    ':(icase)*backdoor*',
+    ':(icase)*postinstall*.js*',
+    ':(icase)*.js*postinstall*'
+]
+
+# libgit2 cannot verify signatures, so this always goes through the git CLI
+SIGNATURE_LOG = ('log', '--pretty=format:%H %G?', '-10')
+
+async def _git_output(directory, *args):
+    """Run a git command and return its raw output lines (empty if it fails)"""
+    process = await asyncio.create_subprocess_exec(
+        'git', *args,
+        cwd=directory,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL
+    )
+    stdout, _ = await process.communicate()
+    if process.returncode != 0:
+        return []
+    return stdout.split(b'\n')
+
+def _decode(lines):
+    return [line.decode('utf-8', 'replace') for line in lines]
+
+async def _git_lines(directory, *args):
+    """Run a git command and return its decoded output lines (empty if it fails)"""
+    return _decode(await _git_output(directory, *args))
+
+async def _git_suspicious_files(directory):
+    """List suspicious files added in the last 30 days, letting git do the matching"""
+    return await _git_lines(
+        directory,
+        'log', '--name-only', '--pretty=format:', '--since=30 days ago', '--diff-filter=A',
+        '--', *SUSPICIOUS_GIT_PATHSPECS
+    )
+
+async def _collect_with_git(directory):
+    """Collect branches, commits, added files, remotes and signatures via the git CLI"""
+    # The commands are independent, so run them all at once
+    branches, commits, files, remotes, signatures = await asyncio.gather(
+        _git_lines(directory, 'branch', '-a'),
+        _git_lines(directory, 'log', '--oneline', '-20'),
+        _git_suspicious_files(directory),
+        _git_lines(directory, 'remote', '-v'),
+        _git_lines(directory, *SIGNATURE_LOG)
+    )
+    return {
+        'branches': [b.strip().replace('*', '').strip() for b in branches if b.strip()],
+        'commits': commits,
+        'files': files,
+        'remotes': remotes,
+        'signatures': signatures
+    }
+
+def _collect_with_pygit2(directory):
+    """Collect the same data as _collect_with_git in-process through libgit2 (except signatures)"""
+    repo = pygit2.Repository(directory)
+    
+    branches = list(repo.branches.local)
+    branches += [f"remotes/{name}" for name in repo.branches.remote]
+    
+    commits = []
+    files = []
+    if not repo.head_is_unborn:
+        since = time.time() - RECENT_FILES_WINDOW
+        for commit in repo.walk(repo.head.target, pygit2.GIT_SORT_TIME):
+            in_window = commit.commit_time > since
+            if len(commits) >= 20 and not in_window:
+                break
+            if len(commits) < 20:
+                summary = commit.message.split('\n', 1)[0]
+                commits.append(f"{commit.short_id} {summary}")
+            # Like git log, merge commits list no files by default
+            if in_window and len(commit.parents) <= 1:
+                if commit.parents:
+                    diff = commit.parents[0].tree.diff_to_tree(commit.tree)
+                else:
+                    diff = commit.tree.diff_to_tree(swap=True)
+                files.extend(
+                    delta.new_file.path for delta in diff.deltas
+                    if delta.status == pygit2.GIT_DELTA_ADDED
+                )
+    
+    remotes = []
+    for remote in repo.remotes:
+        remotes.append(f"{remote.name}\t{remote.url} (fetch)")
+        remotes.append(f"{remote.name}\t{remote.push_url or remote.url} (push)")
+    
+    return {
+        'branches': branches,
+        'commits': commits,
+        'files': files,
+        'remotes': remotes
+    }
+
+def _collect_git_data(directory):
+    """Read repository data with pygit2 when available, else the git CLI"""
+    if pygit2 is not None:
+        try:
+            git_data = _collect_with_pygit2(directory)
+        except (pygit2.GitError, KeyError, ValueError) as error:
+            log.debug(f"pygit2 failed, falling back to git CLI: {error}")
+        else:
+            # Signature status needs the git CLI; without it, skip that check
+            try:
+                git_data['signatures'] = asyncio.run(_git_lines(directory, *SIGNATURE_LOG))
+            except OSError as error:
+                log.debug(f"Failed to read commit signatures: {error}")
+                git_data['signatures'] = []
+            return git_data
+    return asyncio.run(_collect_with_git(directory))
+
+def scan_git_repository(directory, is_json=False, is_git_repo=None):
     """
     Scans local git repository for Shai-Hulud indicators without GitHub API
     
     Args:
         directory (str): Project directory
         is_json (bool): JSON output mode
+        is_git_repo (bool): Whether directory has a .git entry (checked if None)
     
     Returns:
         dict: Scan results with gitIssues
@@ -23,46 +150,19 @@ def scan_git_repository(directory, is_json=False):
     results = {'gitIssues': []}
     
     # Check if it's a git repository
-    git_dir = Path(directory) / '.git'
-    if not git_dir.exists():
+    if is_git_repo is None:
+        is_git_repo = (Path(directory) / '.git').exists()
+    if not is_git_repo:
         # Silently return - UI will handle this
         return results
     
     try:
+        git_data = _collect_git_data(directory)
+        
         # Check for suspicious branches
-        try:
-            result = subprocess.run(
-                ['git', 'branch', '-a'],
-                cwd=directory,
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            branches = [
-                b.strip().replace('*', '').strip()
-                for b in result.stdout.split('\n')
-                if b.strip()
-            ]
-        except subprocess.CalledProcessError:
-            branches = []
+        branches = git_data['branches']
         
-        suspicious_branches = []
-        for branch in branches:
-            lower_branch = branch.lower()
-            if (
-                'shai-hulud' in lower_branch or
-                'exfiltrate' in lower_branch or
-                'malware' in lower_branch or
-                'backdoor' in lower_branch or
-                # Only flag migration if it's specifically suspicious, not legitimate migrations
-                ('migration' in lower_branch and (
-                    'shai' in lower_branch or
-                    'hulud' in lower_branch or
-                    'worm' in lower_branch or
-                    'malicious' in lower_branch
-                ))
-            ):
-                suspicious_branches.append(branch)
+        suspicious_branches = [branch for branch in branches if SUSPICIOUS_BRANCH.search(branch)]
         
         if suspicious_branches:
             results['gitIssues'].append({
@@ -73,44 +173,16 @@ def scan_git_repository(directory, is_json=False):
             # Silently add to results - UI will handle display
         
         # Check recent commits for suspicious patterns
-        try:
-            result = subprocess.run(
-                ['git', 'log', '--oneline', '-20'],
-                cwd=directory,
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            recent_commits = result.stdout
-        except subprocess.CalledProcessError:
-            recent_commits = ""
+        recent_commits = git_data['commits']
         
-        suspicious_commit_patterns = [
-            re.compile(r'shai-hulud', re.IGNORECASE),
-            re.compile(r'add.*bundle\.js', re.IGNORECASE),  # Only flag if actually adding bundle.js
-            re.compile(r'postinstall.*malicious', re.IGNORECASE),
-            re.compile(r'trufflehog', re.IGNORECASE),
-            re.compile(r'webhook\.site', re.IGNORECASE),
-            re.compile(r'exfiltrat', re.IGNORECASE),
-            re.compile(r'malicious.*package', re.IGNORECASE),
-            re.compile(r'backdoor', re.IGNORECASE)
+        suspicious_commits = [
+            commit.strip() for commit in recent_commits
+            if SUSPICIOUS_COMMIT.search(commit)
         ]
         
-        suspicious_commits = []
-        for commit in recent_commits.split('\n'):
-            for pattern in suspicious_commit_patterns:
-                if pattern.search(commit):
-                    suspicious_commits.append(commit.strip())
-                    break
-        
         if suspicious_commits:
             # Remove duplicates while preserving order
-            unique_commits = []
-            seen = set()
-            for commit in suspicious_commits:
-                if commit not in seen:
-                    unique_commits.append(commit)
-                    seen.add(commit)
+            unique_commits = list(dict.fromkeys(suspicious_commits))
             
             results['gitIssues'].append({
                 'type': 'suspicious-commits',
@@ -120,43 +192,16 @@ def scan_git_repository(directory, is_json=False):
             # Silently add to results - UI will handle display
         
         # Check for suspicious files in git history
-        try:
-            result = subprocess.run(
-                ['git', 'log', '--name-only', '--pretty=format:', '--since=30 days ago'],
-                cwd=directory,
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            added_files = result.stdout
-        except subprocess.CalledProcessError:
-            added_files = ""
+        added_files = git_data['files']
         
-        suspicious_files = []
-        for file_name in added_files.split('\n'):
-            file_name = file_name.strip()
-            if not file_name:
-                continue
-            
-            lower_file = file_name.lower()
-            if (
-                'bundle.js' in lower_file or
-                'shai-hulud' in lower_file or
-                'malware' in lower_file or
-                'backdoor' in lower_file or
-                # Only flag specific suspicious file patterns
-                ('postinstall' in lower_file and '.js' in lower_file)
-            ):
-                suspicious_files.append(file_name)
+        suspicious_files = [
+            file_name.strip() for file_name in added_files
+            if SUSPICIOUS_GIT_FILE.search(file_name)
+        ]
         
         if suspicious_files:
             # Remove duplicates while preserving order
-            unique_files = []
-            seen = set()
-            for file_name in suspicious_files:
-                if file_name not in seen:
-                    unique_files.append(file_name)
-                    seen.add(file_name)
+            unique_files = list(dict.fromkeys(suspicious_files))
             
             results['gitIssues'].append({
                 'type': 'suspicious-files-added',
@@ -169,61 +214,35 @@ def scan_git_repository(directory, is_json=False):
                     log.gray(f"  {file_name}")
         
         # Check remote URLs for suspicious patterns
-        try:
-            result = subprocess.run(
-                ['git', 'remote', '-v'],
-                cwd=directory,
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            remotes = result.stdout
-            
-            suspicious_remotes = [
-                line for line in remotes.split('\n')
-                if line and ('Shai-Hulud' in line or 'shai-hulud' in line)
-            ]
-            
-            if suspicious_remotes:
-                results['gitIssues'].append({
-                    'type': 'suspicious-remote',
-                    'remotes': suspicious_remotes,
-                    'reason': 'Git remotes point to suspicious repositories'
-                })
-                if not is_json:
-                    log.warn('Suspicious git remotes found')
-        except subprocess.CalledProcessError:
-            # Skip if no remotes
-            pass
+        suspicious_remotes = [
+            line for line in git_data['remotes']
+            if line and ('Shai-Hulud' in line or 'shai-hulud' in line)
+        ]
+        
+        if suspicious_remotes:
+            results['gitIssues'].append({
+                'type': 'suspicious-remote',
+                'remotes': suspicious_remotes,
+                'reason': 'Git remotes point to suspicious repositories'
+            })
+            if not is_json:
+                log.warn('Suspicious git remotes found')
         
         # Check for unsigned commits (only warn if there are other suspicious indicators)
-        try:
-            result = subprocess.run(
-                ['git', 'log', '--pretty=format:%H %G?', '-10'],
-                cwd=directory,
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            unsigned_commits = result.stdout
-            
-            has_unsigned_recent = any(
-                'N' in line or 'U' in line
-                for line in unsigned_commits.split('\n')
-                if line
-            )
-            
-            # Only flag unsigned commits if there are other suspicious findings
-            if has_unsigned_recent and results['gitIssues']:
-                results['gitIssues'].append({
-                    'type': 'unsigned-commits',
-                    'reason': 'Unsigned commits detected alongside other suspicious indicators'
-                })
-                if not is_json:
-                    log.warn('Recent commits are not GPG signed (combined with other suspicious activity)')
-        except subprocess.CalledProcessError:
-            # Skip if GPG not configured
-            pass
+        has_unsigned_recent = any(
+            'N' in line or 'U' in line
+            for line in git_data['signatures']
+            if line
+        )
+        
+        # Only flag unsigned commits if there are other suspicious findings
+        if has_unsigned_recent and results['gitIssues']:
+            results['gitIssues'].append({
+                'type': 'unsigned-commits',
+                'reason': 'Unsigned commits detected alongside other suspicious indicators'
+            })
+            if not is_json:
+                log.warn('Recent commits are not GPG signed (combined with other suspicious activity)')
     
     except Exception as error:
         if not is_json:
@@ -3,34 +3,365 @@
 GitHub scanner for Shai-Hulud Scanner
 """
 
+import asyncio
+import hashlib
+import heapq
+import json
+import threading
+import time
+from collections import deque
+from urllib.parse import parse_qs, urlparse
 import requests
-from ..constants import HTTP_TIMEOUT
+from ..constants import HTTP_TIMEOUT, SUSPICIOUS_REPO, SUSPICIOUS_GITHUB_BRANCH, SUSPICIOUS_GITHUB_WORKFLOW, CACHE_DIR
 from ..utils.logger import log
 
+try:
+    import orjson
+except ImportError:  # Optional, install with the "fast" extra
+    orjson = None
+
+# Maximum number of GitHub API requests in flight
+MAX_CONCURRENT_REQUESTS = 10
+
+# Longest a request waits for a rate-limited token to become usable (seconds)
+MAX_RATE_LIMIT_WAIT = 60
+
+# Largest page size the REST API allows
+REPOS_PER_PAGE = 100
+
+# The org's most recently pushed and most recently updated repository. Any
+# push, new repository, rename or visibility change alters one of these
+# listings, so together their ETags tell whether an earlier scan still holds.
+ORG_FINGERPRINT_ENDPOINTS = (
+    'orgs/{org}/repos?sort=pushed&per_page=1',
+    'orgs/{org}/repos?sort=updated&per_page=1',
+)
+
+# Everything the org scan needs, for up to 100 repositories per request
+ORG_REPOS_QUERY = """
+query($org: String!, $cursor: String) {
+  organization(login: $org) {
+    repositories(first: 100, after: $cursor) {
+      pageInfo { endCursor hasNextPage }
+      nodes {
+        name
+        nameWithOwner
+        refs(refPrefix: "refs/heads/", query: "%s", first: 100) { nodes { name } }
+        object(expression: "HEAD:.github/workflows") { ... on Tree { entries { path } } }
+      }
+    }
+  }
+}
+""" % SUSPICIOUS_GITHUB_BRANCH
+
+# Everything that decides what the org scan reports; cached results are only
+# reused when it is unchanged
+DETECTION_KEY = '\0'.join(map(str, (
+    SUSPICIOUS_REPO.pattern, SUSPICIOUS_REPO.flags, SUSPICIOUS_GITHUB_BRANCH, SUSPICIOUS_GITHUB_WORKFLOW, ORG_REPOS_QUERY
+)))
+
+def _loads(data):
+    """Parse JSON bytes, with orjson when available"""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
 class GitHubScanner:
     def __init__(self, token):
-        self.token = token
+        # One or more tokens, as a list or a comma-separated string
+        tokens = token.split(',') if isinstance(token, str) else token
+        self.tokens = [t.strip() for t in tokens if t.strip()]
+        self.token = self.tokens[0] if self.tokens else None
         self.headers = {
-            'Authorization': f'token {token}',
             'Accept': 'application/vnd.github.v3+json'
         }
         self.base_url = 'https://api.github.com'
+        
+        # Reuse connections across requests, one per concurrent request
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=MAX_CONCURRENT_REQUESTS)
+        self.session.mount('https://', adapter)
+        
+        # Requests rotate through the tokens; rate-limited tokens are parked
+        # in a (wake time, token) heap until their limit resets
+        self._tokens = deque(self.tokens)
+        self._parked = []
+        self._lock = threading.Lock()
     
-    def _make_request(self, endpoint):
-        """Make authenticated request to GitHub API"""
-        url = f"{self.base_url}/{endpoint}"
-        response = requests.get(url, headers=self.headers, timeout=HTTP_TIMEOUT)
+    def _next_token(self):
+        """Returns the next usable token, waiting briefly for a parked one, or None"""
+        with self._lock:
+            now = time.time()
+            while self._parked and self._parked[0][0] <= now:
+                self._tokens.append(heapq.heappop(self._parked)[1])
+            
+            if self._tokens:
+                token = self._tokens[0]
+                self._tokens.rotate(-1)
+                return token
+            
+            if not self._parked:
+                return None
+            wake = self._parked[0][0]
+        
+        if wake - now > MAX_RATE_LIMIT_WAIT:
+            return None
+        time.sleep(wake - now)
+        return self._next_token()
+    
+    def _park(self, token, wake):
+        """Stops using a rate-limited token until wake (epoch seconds)"""
+        with self._lock:
+            if token in self._tokens:
+                self._tokens.remove(token)
+                heapq.heappush(self._parked, (wake, token))
+    
+    @staticmethod
+    def _rate_limit_reset(response):
+        """Returns when a rate-limited response's token can be reused, or None"""
+        if response.status_code not in (403, 429):
+            return None
+        
+        # Secondary rate limits say how long to back off
+        retry_after = response.headers.get('Retry-After')
+        if retry_after is not None:
+            return time.time() + (int(retry_after) if retry_after.isdigit() else MAX_RATE_LIMIT_WAIT)
+        
+        # Primary rate limit, exhausted until the reset time
+        if response.headers.get('X-RateLimit-Remaining') == '0':
+            return float(response.headers.get('X-RateLimit-Reset') or time.time() + MAX_RATE_LIMIT_WAIT)
+        
+        return None
+    
+    def _send(self, send, url, headers=None, **kwargs):
+        """Send a request with the next usable token, moving on from rate-limited ones"""
+        while True:
+            token = self._next_token()
+            if token is None:
+                raise requests.exceptions.HTTPError('GitHub API rate limit exceeded for every token')
+            
+            auth = {'Authorization': f'token {token}'}
+            response = send(url, headers={**(headers or {}), **auth}, timeout=HTTP_TIMEOUT, **kwargs)
+            wake = self._rate_limit_reset(response)
+            if wake is None:
+                return response
+            
+            log.debug(f"GitHub token rate limited until {time.ctime(wake)}")
+            self._park(token, wake)
+    
+    def _make_request(self, endpoint, with_links=False):
+        """
+        Make authenticated request to GitHub API, for an endpoint or a full URL.
+        With with_links, returns (data, parsed Link header) for paginated endpoints.
+        """
+        url = endpoint if '://' in endpoint else f"{self.base_url}/{endpoint}"
+        response = self._send(self.session.get, url)
+        response.raise_for_status()
+        if with_links:
+            return _loads(response.content), response.links
+        return _loads(response.content)
+    
+    def _etag(self, endpoint, etag=None):
+        """
+        Returns the ETag of an endpoint's current response, revalidating etag
+        with a conditional request (which does not count against rate limits).
+        """
+        headers = {'If-None-Match': etag} if etag else None
+        response = self._send(self.session.get, f"{self.base_url}/{endpoint}", headers=headers)
+        if response.status_code == 304:
+            return etag
+        response.raise_for_status()
+        return response.headers.get('ETag')
+    
+    async def _make_request_async(self, endpoint, semaphore, with_links=False):
+        """Run _make_request on a worker thread, bounded by semaphore"""
+        async with semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, self._make_request, endpoint, with_links)
+    
+    def _graphql(self, query, variables):
+        """Run a GraphQL query against the GitHub API and return its data"""
+        response = self._send(
+            self.session.post,
+            f"{self.base_url}/graphql",
+            json={'query': query, 'variables': variables}
+        )
         response.raise_for_status()
-        return response.json()
+        payload = _loads(response.content)
+        if payload.get('errors'):
+            raise ValueError(payload['errors'][0].get('message', 'GraphQL query failed'))
+        return payload['data']
+
+def _check_repo(repo_name, name, branch_names, workflow_paths):
+    """
+    Checks one repository's name, branch names and workflow paths.
+    Returns a list of (issue, warning message) tuples.
+    """
+    findings = []
+    
+    # Repo name check
+    if SUSPICIOUS_REPO.search(name):
+        findings.append(({
+            'type': 'repo',
+            'name': repo_name
+        }, f"Suspicious repo: {repo_name}"))
+    
+    # Check branches
+    for branch_name in branch_names:
+        if branch_name == SUSPICIOUS_GITHUB_BRANCH:
+            findings.append(({
+                'type': 'branch',
+                'name': f"{repo_name} (branch: {SUSPICIOUS_GITHUB_BRANCH})"
+            }, f"Suspicious branch '{SUSPICIOUS_GITHUB_BRANCH}' in: {repo_name}"))
+    
+    # Check workflows
+    for path in workflow_paths:
+        if SUSPICIOUS_GITHUB_WORKFLOW in path:
+            findings.append(({
+                'type': 'workflow',
+                'name': repo_name
+            }, f"Suspicious workflow in: {repo_name}"))
+    
+    return findings
+
+def _scan_org_graphql(scanner, org):
+    """
+    Checks every repository in the org with paginated GraphQL queries.
+    Returns (repository count, findings).
+    """
+    repo_count = 0
+    findings = []
+    cursor = None
+    
+    while True:
+        data = scanner._graphql(ORG_REPOS_QUERY, {'org': org, 'cursor': cursor})
+        if not data.get('organization'):
+            raise ValueError(f"Organization '{org}' not found")
+        repositories = data['organization']['repositories']
+        
+        for repo in repositories['nodes']:
+            repo_count += 1
+            branch_names = [ref['name'] for ref in repo['refs']['nodes']]
+            workflows = repo.get('object') or {}
+            workflow_paths = [entry['path'] for entry in workflows.get('entries', [])]
+            findings.extend(_check_repo(repo['nameWithOwner'], repo['name'], branch_names, workflow_paths))
+        
+        if not repositories['pageInfo']['hasNextPage']:
+            return repo_count, findings
+        cursor = repositories['pageInfo']['endCursor']
+
+async def _scan_repo_rest(scanner, org, repo, semaphore):
+    """
+    Checks one repository through the REST API.
+    Returns a list of (issue, warning message) tuples.
+    """
+    # Fetch branches and workflows concurrently; a failure in one (e.g. no
+    # access) does not prevent checking the other
+    branches, workflows = await asyncio.gather(
+        scanner._make_request_async(f'repos/{org}/{repo["name"]}/branches', semaphore),
+        scanner._make_request_async(f'repos/{org}/{repo["name"]}/actions/workflows', semaphore),
+        return_exceptions=True
+    )
+    
+    for response in (branches, workflows):
+        if isinstance(response, BaseException) and not isinstance(response, requests.exceptions.RequestException):
+            raise response
+    
+    branch_names = [] if isinstance(branches, BaseException) else [b['name'] for b in branches]
+    workflow_paths = [] if isinstance(workflows, BaseException) else [
+        w.get('path', '') for w in workflows.get('workflows', [])
+    ]
+    return _check_repo(repo['full_name'], repo['name'], branch_names, workflow_paths)
 
-def scan_github(token, org, is_json=False):
+async def _list_org_repos(scanner, org, semaphore):
+    """Lists every repository in the org, fetching pages concurrently"""
+    endpoint = f'orgs/{org}/repos?per_page={REPOS_PER_PAGE}'
+    repos, links = await scanner._make_request_async(endpoint, semaphore, with_links=True)
+    
+    # The last page link gives the page count, so the rest can be fetched at once
+    last_page = parse_qs(urlparse(links.get('last', {}).get('url', '')).query).get('page')
+    if last_page:
+        pages = await asyncio.gather(*(
+            scanner._make_request_async(f'{endpoint}&page={page}', semaphore)
+            for page in range(2, int(last_page[0]) + 1)
+        ))
+        for page in pages:
+            repos.extend(page)
+        return repos
+    
+    # Otherwise follow the next page links one at a time
+    while 'next' in links:
+        page, links = await scanner._make_request_async(links['next']['url'], semaphore, with_links=True)
+        repos.extend(page)
+    return repos
+
+async def _scan_org_rest(scanner, org):
+    """
+    Checks every repository in the org concurrently through the REST API.
+    Returns (repository count, findings).
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    
+    # List repositories for the organization
+    repos = await _list_org_repos(scanner, org, semaphore)
+    
+    repo_findings = await asyncio.gather(*(
+        _scan_repo_rest(scanner, org, repo, semaphore) for repo in repos
+    ))
+    return len(repos), [finding for findings in repo_findings for finding in findings]
+
+def _org_cache_path(scanner, org):
+    """
+    Returns the cache file for scans of org with this set of tokens and
+    detection logic, since tokens with different access see different
+    (private) repositories
+    """
+    key = hashlib.sha256('\0'.join([DETECTION_KEY, *sorted(scanner.tokens)]).encode()).hexdigest()
+    return CACHE_DIR / f"github-{org}-{key[:16]}.json"
+
+def _org_etags(scanner, org, cached_etags):
+    """Returns the current ETags of the org's fingerprint listings, or None"""
+    try:
+        return [
+            scanner._etag(endpoint.format(org=org), etag)
+            for endpoint, etag in zip(ORG_FINGERPRINT_ENDPOINTS, cached_etags)
+        ]
+    except requests.exceptions.RequestException as e:
+        log.debug(f"Failed to fingerprint org '{org}': {e}")
+        return None
+
+def _load_org_cache(scanner, org):
+    """Loads the previous scan of org as a dict with etags, repoCount and findings"""
+    try:
+        with open(_org_cache_path(scanner, org), 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        return {
+            'etags': cached['etags'],
+            'repoCount': cached['repoCount'],
+            'findings': [tuple(finding) for finding in cached['findings']]
+        }
+    except (json.JSONDecodeError, OSError, KeyError, TypeError):
+        return None
+
+def _save_org_cache(scanner, org, etags, repo_count, findings):
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(_org_cache_path(scanner, org), 'w', encoding='utf-8') as f:
+            json.dump({'etags': etags, 'repoCount': repo_count, 'findings': findings}, f)
+    except OSError as e:
+        log.debug(f"Failed to cache GitHub scan results: {e}")
+
+async def scan_github_async(token, org, is_json=False, use_cache=False):
     """
     Scans GitHub org for suspicious repos/branches/workflows.
+    Uses a single paginated GraphQL query, falling back to concurrent REST
+    calls per repository if GraphQL fails. With use_cache, results are
+    reused while the org's repository listings are unchanged (same ETags).
     
     Args:
-        token (str): GitHub token
+        token (str): GitHub token, or several comma-separated
         org (str): Organization name
         is_json (bool): JSON mode
+        use_cache (bool): Reuse results from an earlier scan of an unchanged org
     
     Returns:
         dict: Results with githubIssues
@@ -45,55 +376,35 @@ def scan_github(token, org, is_json=False):
     scanner = GitHubScanner(token)
     
     try:
-        # List repositories for the organization
-        repos = scanner._make_request(f'orgs/{org}/repos')
+        loop = asyncio.get_running_loop()
         
-        if not is_json:
-            log.cyan(f"GitHub scan for org '{org}' ({len(repos)} repos checked):")
+        cached = etags = None
+        if use_cache:
+            cached = _load_org_cache(scanner, org)
+            cached_etags = cached['etags'] if cached else [None] * len(ORG_FINGERPRINT_ENDPOINTS)
+            etags = await loop.run_in_executor(None, _org_etags, scanner, org, cached_etags)
         
-        for repo in repos:
-            repo_name = repo['full_name']
-            
-            # Repo name check
-            if '-migration' in repo['name'] or repo['name'] == 'Shai-Hulud':
-                results['githubIssues'].append({
-                    'type': 'repo',
-                    'name': repo_name
-                })
-                if not is_json:
-                    log.warn(f"Suspicious repo: {repo_name}")
-            
-            # Check branches
+        if cached and etags == cached_etags:
+            log.debug('Using cached GitHub scan results')
+            repo_count, findings = cached['repoCount'], cached['findings']
+        else:
             try:
-                branches = scanner._make_request(f'repos/{org}/{repo["name"]}/branches')
-                
-                for branch in branches:
-                    if branch['name'] == 'shai-hulud':
-                        results['githubIssues'].append({
-                            'type': 'branch',
-                            'name': f"{repo_name} (branch: shai-hulud)"
-                        })
-                        if not is_json:
-                            log.warn(f"Suspicious branch 'shai-hulud' in: {repo_name}")
-            except requests.exceptions.RequestException:
-                # Skip repo if no access
-                continue
+                repo_count, findings = await loop.run_in_executor(None, _scan_org_graphql, scanner, org)
+            except (requests.exceptions.RequestException, ValueError, KeyError, TypeError) as error:
+                log.debug(f"GraphQL org scan failed, falling back to REST: {error}")
+                repo_count, findings = await _scan_org_rest(scanner, org)
             
-            # Check workflows
-            try:
-                workflows = scanner._make_request(f'repos/{org}/{repo["name"]}/actions/workflows')
-                
-                for workflow in workflows.get('workflows', []):
-                    if 'shai-hulud-workflow.yml' in workflow.get('path', ''):
-                        results['githubIssues'].append({
-                            'type': 'workflow',
-                            'name': repo_name
-                        })
-                        if not is_json:
-                            log.warn(f"Suspicious workflow in: {repo_name}")
-            except requests.exceptions.RequestException:
-                # Skip if workflows not accessible
-                continue
+            if etags and all(etags):
+                _save_org_cache(scanner, org, etags, repo_count, findings)
+        
+        if not is_json:
+            log.cyan(f"GitHub scan for org '{org}' ({repo_count} repos checked):")
+        
+        # Report in repository order
+        for issue, message in findings:
+            results['githubIssues'].append(issue)
+            if not is_json:
+                log.warn(message)
         
         if not results['githubIssues'] and not is_json:
             log.success('No GitHub issues detected.')
@@ -110,3 +421,18 @@ def scan_github(token, org, is_json=False):
         results['githubError'] = error_msg
     
     return results
+
+def scan_github(token, org, is_json=False, use_cache=False):
+    """
+    Scans GitHub org for suspicious repos/branches/workflows.
+    
+    Args:
+        token (str): GitHub token, or several comma-separated
+        org (str): Organization name
+        is_json (bool): JSON mode
+        use_cache (bool): Reuse results from an earlier scan of an unchanged org
+    
+    Returns:
+        dict: Results with githubIssues
+    """
+    return asyncio.run(scan_github_async(token, org, is_json, use_cache))
@@ -5,23 +5,83 @@ Affected list fetcher service for Shai-Hulud Scanner
 
 import json
 import os
+import time
+from dataclasses import dataclass
 import requests
 from pathlib import Path
-from ..constants import DEFAULT_BADLIST_URL, HTTP_TIMEOUT
+from ..constants import DEFAULT_BADLIST_URL, HTTP_TIMEOUT, BADLIST_CACHE_TTL, CACHE_DIR
 from ..utils.logger import log
 
+try:
+    import orjson
+except ImportError:  # Optional, install with the "fast" extra
+    orjson = None
+
 CACHE_FILENAME = "affected-packages-cache.json"
+CACHE_META_FILENAME = "affected-packages-cache.meta.json"
 
-def fetch_remote_affected_list(url=DEFAULT_BADLIST_URL):
+@dataclass
+class BadList:
     """
-    Fetches fresh affected list from remote URL every time the tool runs.
-    Returns affected list dictionary
+    An affected list as loaded (raw) and indexed for lookups as
+    {package name: frozenset of affected versions} (index).
     """
+    raw: dict
+    index: dict
+    
+    @classmethod
+    def from_raw(cls, affected_list):
+        """Indexes an affected list dictionary, skipping '_' metadata keys"""
+        index = {
+            name: frozenset(versions if isinstance(versions, list) else [versions])
+            for name, versions in affected_list.items()
+            if not name.startswith('_')
+        }
+        return cls(affected_list, index)
+
+# Affected list already loaded in this process, if any
+_BADLIST_CACHE = None
+
+def set_badlist(badlist):
+    """
+    Seeds the in-process affected list (a BadList) so get_badlist() skips
+    loading it again.
+    """
+    global _BADLIST_CACHE
+    _BADLIST_CACHE = badlist
+
+def invalidate_badlist_cache():
+    """Forgets the in-process affected list so the next get_badlist() reloads it"""
+    global _BADLIST_CACHE
+    _BADLIST_CACHE = None
+
+def _loads(data):
+    """Parse JSON bytes, with orjson when available"""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+def fetch_remote_affected_list(url=DEFAULT_BADLIST_URL, validators=None):
+    """
+    Fetches fresh affected list from remote URL.
+    validators holds the cached copy's 'etag'/'last_modified' to make the
+    request conditional.
+    Returns (affected list dictionary, response headers), with None instead of
+    the list if the remote copy has not been modified.
+    """
+    headers = {}
+    if validators:
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+    
     try:
-        response = requests.get(url, timeout=HTTP_TIMEOUT)
+        response = requests.get(url, headers=headers, timeout=HTTP_TIMEOUT)
+        if response.status_code == 304:
+            log.debug("Remote affected-packages.json not modified.")
+            return None, response.headers
         response.raise_for_status()
         
-        affected_list = response.json()
+        affected_list = _loads(response.content)
         
         # Validate structure
         if not isinstance(affected_list, dict):
@@ -30,7 +90,7 @@ def fetch_remote_affected_list(url=DEFAULT_BADLIST_URL):
         package_count = len([k for k in affected_list.keys() if not k.startswith('_')])
         log.info(f"Fetched latest affected-packages.json from remote ({package_count} packages).")
         
-        return affected_list
+        return affected_list, response.headers
         
     except requests.exceptions.RequestException as e:
         raise Exception(f"Network error: {e}")
@@ -39,19 +99,20 @@ def fetch_remote_affected_list(url=DEFAULT_BADLIST_URL):
     except Exception as e:
         raise Exception(f"Failed to fetch remote affected list: {e}")
 
-def load_cached_badlist():
+def load_cached_badlist(max_age=BADLIST_CACHE_TTL):
     """
-    Loads cached badlist from current directory if it exists.
-    Returns affected list dictionary or None if cache doesn't exist or is invalid.
+    Loads cached badlist from the user cache directory if it exists.
+    Returns affected list dictionary or None if cache doesn't exist, is invalid
+    or is older than max_age seconds (None accepts any age).
     """
-    cache_path = Path.cwd() / CACHE_FILENAME
-    
-    if not cache_path.exists():
-        return None
+    cache_path = CACHE_DIR / CACHE_FILENAME
     
     try:
-        with open(cache_path, 'r', encoding='utf-8') as f:
-            cached_list = json.load(f)
+        if max_age is not None and time.time() - cache_path.stat().st_mtime > max_age:
+            return None
+        
+        with open(cache_path, 'rb') as f:
+            cached_list = _loads(f.read())
         
         # Validate structure
         if not isinstance(cached_list, dict):
@@ -65,38 +126,81 @@ def load_cached_badlist():
     except (json.JSONDecodeError, IOError):
         return None
 
-def save_cached_badlist(affected_list):
+def load_cache_validators():
     """
-    Saves affected list to cache file in current directory.
+    Loads the ETag/Last-Modified recorded for the cached badlist.
+    Returns a dictionary, empty if there is no usable cache.
     """
-    cache_path = Path.cwd() / CACHE_FILENAME
+    if not (CACHE_DIR / CACHE_FILENAME).exists():
+        return {}
     
     try:
-        with open(cache_path, 'w', encoding='utf-8') as f:
-            json.dump(affected_list, f, indent=2)
+        with open(CACHE_DIR / CACHE_META_FILENAME, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        return meta if isinstance(meta, dict) else {}
+    except (json.JSONDecodeError, IOError):
+        return {}
+
+def save_cached_badlist(affected_list, headers=None):
+    """
+    Saves affected list to cache file in the user cache directory, along with
+    the response's ETag/Last-Modified for conditional refetches.
+    """
+    cache_path = CACHE_DIR / CACHE_FILENAME
+    headers = headers or {}
+    meta = {
+        'etag': headers.get('ETag'),
+        'last_modified': headers.get('Last-Modified')
+    }
+    
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        if orjson is not None:
+            with open(cache_path, 'wb') as f:
+                f.write(orjson.dumps(affected_list, option=orjson.OPT_INDENT_2))
+        else:
+            with open(cache_path, 'w', encoding='utf-8') as f:
+                json.dump(affected_list, f, indent=2)
+        with open(CACHE_DIR / CACHE_META_FILENAME, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
         log.debug(f"Cached affected list to {cache_path}")
     except IOError as e:
         log.warn(f"Failed to cache affected list: {e}")
 
-def get_badlist():
+def _load_badlist():
     """
-    Gets affected list by checking cache first, then fetching fresh data if needed.
+    Loads the affected list by checking cache first, then fetching fresh data
+    if needed, then falling back to the bundled copy.
     Returns affected list dictionary
     """
-    # First check if we have a cached version
+    # First check if we have a fresh cached version
     cached_list = load_cached_badlist()
     if cached_list is not None:
         return cached_list
     
     try:
-        # Fetch fresh data and cache it
-        affected_list = fetch_remote_affected_list()
-        save_cached_badlist(affected_list)
+        # Revalidate a stale cache, or fetch fresh data and cache it
+        affected_list, headers = fetch_remote_affected_list(validators=load_cache_validators())
+        if affected_list is None:
+            cached_list = load_cached_badlist(max_age=None)
+            if cached_list is not None:
+                # Unchanged upstream; restart the cache's freshness window
+                os.utime(CACHE_DIR / CACHE_FILENAME)
+                return cached_list
+            affected_list, headers = fetch_remote_affected_list()
+        
+        save_cached_badlist(affected_list, headers)
         return affected_list
         
     except Exception as error:
-        # Only use local fallback file if remote fetch fails and no cache exists
         log.warn(f"Remote fetch failed: {error}")
+        
+        # A stale cache is still newer than the bundled list
+        cached_list = load_cached_badlist(max_age=None)
+        if cached_list is not None:
+            return cached_list
+        
+        # Only use local fallback file if remote fetch fails and no cache exists
         log.info("Falling back to local affected-packages.json...")
         
         try:
@@ -104,8 +208,8 @@ def get_badlist():
             script_dir = Path(__file__).parent.parent.parent
             local_affected_list_path = script_dir / 'affected-packages.json'
             
-            with open(local_affected_list_path, 'r', encoding='utf-8') as f:
-                local_affected_list = json.load(f)
+            with open(local_affected_list_path, 'rb') as f:
+                local_affected_list = _loads(f.read())
             
             package_count = len([k for k in local_affected_list.keys() if not k.startswith('_')])
             log.info(f"📦 Using local affected-packages.json ({package_count} packages).")
@@ -115,3 +219,13 @@ def get_badlist():
         except (FileNotFoundError, json.JSONDecodeError) as e:
             log.error("Failed to load local affected-packages.json. Cannot proceed without threat intelligence.")
             raise Exception("No affected list available - ensure affected-packages.json exists and is readable")
+
+def get_badlist():
+    """
+    Gets the affected list, loading it at most once per process.
+    Returns the indexed affected list as a BadList
+    """
+    global _BADLIST_CACHE
+    if _BADLIST_CACHE is None:
+        _BADLIST_CACHE = BadList.from_raw(_load_badlist())
+    return _BADLIST_CACHE
@@ -4,34 +4,90 @@ Lockfile parsing utilities for different package managers
 """
 
 import json
+import mmap
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-import yaml
 from .logger import log
 
-def parse_lockfile(directory):
+try:
+    import orjson
+except ImportError:  # Optional, install with the "fast" extra
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # Optional, install with the "stream" extra
+    ijson = None
+
+try:
+    import yaml
+    try:
+        from yaml import CSafeLoader as SafeLoader  # libyaml bindings
+    except ImportError:
+        from yaml import SafeLoader
+except ImportError:  # Optional, install with the "yaml" extra
+    yaml = None
+
+# package-lock.json files above this size are streamed with ijson, when
+# installed, instead of being loaded whole
+NPM_STREAM_PARSE_SIZE = 10 * 1024 * 1024
+
+# A package key in the pnpm-lock.yaml packages section, e.g. "  /pkg/1.0.0:"
+_PNPM_PACKAGE_KEY = re.compile(r'^  [\'"]?(/[^\s\'"]+)[\'"]?:\s*$')
+
+# Non-digit prefix of a version range, e.g. "^" or ">= "
+_VER_PREFIX = re.compile(r'^[^\d]+')
+
+@contextmanager
+def _map_lockfile(lockfile_path):
+    """Maps a lockfile read-only, so parsers see its bytes without a copy"""
+    with open(lockfile_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b''  # Empty files cannot be mapped
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+def parse_lockfile(directory, top_entries=None):
     """
     Parse lockfiles for npm, Yarn, and PNPM to extract dependencies
     Returns list of {name, version} dictionaries
+    
+    top_entries is an optional {name: os.DirEntry} listing of directory used
+    instead of checking each lockfile path.
     """
     dependencies = []
     dir_path = Path(directory)
     
-    # Try npm package-lock.json
-    npm_lock = dir_path / 'package-lock.json'
-    if npm_lock.exists():
-        dependencies.extend(parse_npm_lockfile(npm_lock))
+    def exists(path):
+        if top_entries is not None:
+            return path.name in top_entries
+        return path.exists()
     
-    # Try Yarn yarn.lock
-    yarn_lock = dir_path / 'yarn.lock'
-    if yarn_lock.exists():
-        dependencies.extend(parse_yarn_lockfile(yarn_lock))
+    # npm package-lock.json, Yarn yarn.lock and PNPM pnpm-lock.yaml
+    lockfiles = [
+        (parser, dir_path / name)
+        for name, parser in (
+            ('package-lock.json', parse_npm_lockfile),
+            ('yarn.lock', parse_yarn_lockfile),
+            ('pnpm-lock.yaml', parse_pnpm_lockfile),
+        )
+        if exists(dir_path / name)
+    ]
     
-    # Try PNPM pnpm-lock.yaml
-    pnpm_lock = dir_path / 'pnpm-lock.yaml'
-    if pnpm_lock.exists():
-        dependencies.extend(parse_pnpm_lockfile(pnpm_lock))
+    if len(lockfiles) < 2:
+        for parser, lockfile in lockfiles:
+            dependencies.extend(parser(lockfile))
+        return dependencies
+    
+    # Parse several lockfiles concurrently so their file reads overlap
+    with ThreadPoolExecutor(max_workers=len(lockfiles)) as executor:
+        futures = [executor.submit(parser, lockfile) for parser, lockfile in lockfiles]
+        for future in futures:
+            dependencies.extend(future.result())
     
     return dependencies
 
@@ -40,21 +96,20 @@ def parse_npm_lockfile(lockfile_path):
     dependencies = []
     
     try:
-        with open(lockfile_path, 'r', encoding='utf-8') as f:
-            lock_data = json.load(f)
+        if ijson is not None and os.path.getsize(lockfile_path) > NPM_STREAM_PARSE_SIZE:
+            return _stream_npm_lockfile(lockfile_path)
+        
+        with _map_lockfile(lockfile_path) as data:
+            if orjson is not None:
+                with memoryview(data) as view:
+                    lock_data = orjson.loads(view)
+            else:
+                lock_data = json.loads(data[:])
         
         # Handle different package-lock.json formats
         if 'packages' in lock_data:
             # npm v7+ format
-            for package_path, package_info in lock_data['packages'].items():
-                if package_path == '':  # Skip root package
-                    continue
-                
-                name = package_path.split('node_modules/')[-1]
-                version = package_info.get('version', '0.0.0')
-                
-                if name and version:
-                    dependencies.append({'name': name, 'version': version})
+            dependencies.extend(extract_npm_packages(lock_data['packages'].items()))
         
         elif 'dependencies' in lock_data:
             # npm v6 format
@@ -65,17 +120,95 @@ def parse_npm_lockfile(lockfile_path):
     
     return dependencies
 
-def extract_npm_v6_deps(deps_dict):
-    """Recursively extract dependencies from npm v6 format"""
+def _npm_lockfile_section(f):
+    """
+    Returns the top-level key of a streamed package-lock.json that lists its
+    packages, preferring 'packages' (npm v7+) over 'dependencies' (npm v6)
+    like parse_npm_lockfile, or None. Stops reading once 'packages' is found.
+    """
+    section = None
+    for prefix, event, value in ijson.parse(f):
+        if prefix == '' and event == 'map_key':
+            if value == 'packages':
+                return value
+            if value == 'dependencies':
+                section = value
+    return section
+
+def _stream_npm_lockfile(lockfile_path):
+    """
+    Parse a large npm package-lock.json one package at a time with ijson,
+    without loading the whole document
+    """
+    dependencies = []
+    
+    try:
+        with open(lockfile_path, 'rb') as f:
+            section = _npm_lockfile_section(f)
+            f.seek(0)
+            
+            if section == 'packages':
+                # npm v7+ format
+                dependencies.extend(extract_npm_packages(ijson.kvitems(f, 'packages')))
+            elif section == 'dependencies':
+                # npm v6 format, one top-level dependency tree at a time
+                dependencies.extend(extract_npm_v6_deps(ijson.kvitems(f, 'dependencies')))
+    
+    except (ijson.JSONError, FileNotFoundError, KeyError) as e:
+        log.debug(f"Failed to parse npm lockfile {lockfile_path}: {e}")
+    
+    return dependencies
+
+def extract_npm_packages(packages):
+    """
+    Extract dependencies from the npm v7+ packages map's (path, info) items.
+    Nested installs (node_modules/a/node_modules/b) repeat the same package,
+    so each (name, version) is listed once.
+    """
     dependencies = []
+    seen = set()
     
-    for name, info in deps_dict.items():
-        version = info.get('version', '0.0.0')
-        dependencies.append({'name': name, 'version': version})
+    for package_path, package_info in packages:
+        if package_path == '':  # Skip root package
+            continue
         
-        # Recursively process nested dependencies
-        if 'dependencies' in info:
-            dependencies.extend(extract_npm_v6_deps(info['dependencies']))
+        name = package_path.split('node_modules/')[-1]
+        version = package_info.get('version', '0.0.0')
+        
+        if name and version and (name, version) not in seen:
+            seen.add((name, version))
+            dependencies.append({'name': name, 'version': version})
+    
+    return dependencies
+
+def extract_npm_v6_deps(deps_dict):
+    """
+    Extract dependencies from npm v6 format, including nested ones.
+    Each (name, version) is listed once, however many packages nest it.
+    """
+    dependencies = []
+    seen = set()
+    
+    # deps_dict may also be an iterable of (name, info) items, e.g. streamed
+    items = deps_dict.items() if isinstance(deps_dict, dict) else deps_dict
+    
+    # Depth-first with an explicit stack of iterators, so deep trees need no
+    # Python recursion and the output keeps pre-order
+    stack = [iter(items)]
+    while stack:
+        for name, info in stack[-1]:
+            version = info.get('version', '0.0.0')
+            if (name, version) not in seen:
+                seen.add((name, version))
+                dependencies.append({'name': name, 'version': version})
+            
+            # Descend into nested dependencies before the remaining siblings
+            nested = info.get('dependencies')
+            if nested:
+                stack.append(iter(nested.items()))
+                break
+        else:
+            stack.pop()
     
     return dependencies
 
@@ -84,50 +217,106 @@ def parse_yarn_lockfile(lockfile_path):
     dependencies = []
     
     try:
-        with open(lockfile_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Yarn lockfile format: "package@version", "package@^version":
-        # Use regex to extract package names and versions
-        pattern = r'^"?([^@\s]+)@[^"]*"?:\s*\n(?:\s+.*\n)*?\s+version\s+"([^"]+)"'
-        matches = re.findall(pattern, content, re.MULTILINE)
-        
-        for name, version in matches:
-            dependencies.append({'name': name, 'version': version})
+        # Yarn lockfile format: entries start with an unindented header like
+        # "package@^1.0.0", "package@^1.2.0": followed by an indented
+        # version "x" (or version: x for Yarn 2+) line
+        with _map_lockfile(lockfile_path) as content:
+            name = None
+            for line in iter(content.readline, b'') if content else ():
+                line = line.rstrip(b'\r\n')
+                if not line or line.startswith(b'#'):
+                    continue
+                
+                if not line.startswith((b' ', b'\t')):
+                    # Entry header; the first spec names the package (scoped
+                    # packages start with '@', so look past the first character)
+                    spec = line.lstrip(b'"')
+                    at = spec.find(b'@', 1)
+                    name = spec[:at] if at > 0 and line.endswith(b':') else None
+                
+                elif name:
+                    stripped = line.strip()
+                    if stripped.startswith((b'version ', b'version:')):
+                        version = stripped[len(b'version'):].lstrip(b' :').strip(b'"')
+                        dependencies.append({'name': name.decode('utf-8'), 'version': version.decode('utf-8')})
+                        name = None
     
     except (FileNotFoundError, Exception) as e:
         log.debug(f"Failed to parse Yarn lockfile {lockfile_path}: {e}")
     
     return dependencies
 
-def parse_pnpm_lockfile(lockfile_path):
-    """Parse PNPM pnpm-lock.yaml file"""
+def _pnpm_dependency(package_spec):
+    """Returns {name, version} for a pnpm package key, or None"""
+    # Package spec format: /package/version or /package/version_hash
+    if package_spec.startswith('/'):
+        parts = package_spec[1:].split('/')
+        if len(parts) >= 2:
+            name = '/'.join(parts[:-1])
+            version_part = parts[-1]
+            # Extract version (remove hash if present)
+            version = version_part.split('_')[0]
+            
+            return {'name': name, 'version': version}
+    return None
+
+def _parse_pnpm_lockfile_yaml(lockfile_path):
+    """Parse PNPM pnpm-lock.yaml file as a full YAML document"""
     dependencies = []
     
     try:
         with open(lockfile_path, 'r', encoding='utf-8') as f:
-            lock_data = yaml.safe_load(f)
+            lock_data = yaml.load(f, Loader=SafeLoader) or {}
         
         # PNPM stores dependencies in 'packages' section
         packages = lock_data.get('packages', {})
         
-        for package_spec, package_info in packages.items():
-            # Package spec format: /package/version or /package/version_hash
-            if package_spec.startswith('/'):
-                parts = package_spec[1:].split('/')
-                if len(parts) >= 2:
-                    name = '/'.join(parts[:-1])
-                    version_part = parts[-1]
-                    # Extract version (remove hash if present)
-                    version = version_part.split('_')[0]
-                    
-                    dependencies.append({'name': name, 'version': version})
+        for package_spec in packages:
+            dependency = _pnpm_dependency(package_spec)
+            if dependency:
+                dependencies.append(dependency)
     
     except (yaml.YAMLError, FileNotFoundError, KeyError) as e:
         log.debug(f"Failed to parse PNPM lockfile {lockfile_path}: {e}")
     
     return dependencies
 
+def parse_pnpm_lockfile(lockfile_path):
+    """
+    Parse PNPM pnpm-lock.yaml file by scanning for the packages section keys
+    only, without building the (much larger) YAML document. Falls back to
+    PyYAML, when installed, for files the scan finds no packages in.
+    """
+    dependencies = []
+    
+    try:
+        in_packages = False
+        with open(lockfile_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.startswith((' ', '\n')):
+                    # Top-level key, the packages section runs until the next one
+                    in_packages = line.rstrip() == 'packages:'
+                    continue
+                
+                if in_packages:
+                    match = _PNPM_PACKAGE_KEY.match(line)
+                    if match:
+                        dependency = _pnpm_dependency(match.group(1))
+                        if dependency:
+                            dependencies.append(dependency)
+    
+    except (FileNotFoundError, UnicodeDecodeError) as e:
+        log.debug(f"Failed to parse PNPM lockfile {lockfile_path}: {e}")
+        return dependencies
+    
+    if not dependencies and yaml is not None:
+        return _parse_pnpm_lockfile_yaml(lockfile_path)
+    
+    return dependencies
+
 def clean_version(version):
     """Clean version string by removing prefixes like ^, ~, etc."""
-    return re.sub(r'^[^\d]+', '', version)
+    # Most lockfile versions are already exact
+    if version[:1].isdecimal():
+        return version
+    return _VER_PREFIX.sub('', version)
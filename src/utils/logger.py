@@ -4,10 +4,34 @@ Logging utilities for Shai-Hulud Scanner
 """
 
 import sys
-from colorama import Fore, Style, init
+import colorama
 
-# Initialize colorama for cross-platform colored output
-init(autoreset=True)
+# Colour only when writing to a terminal; piped or redirected output is plain.
+# Errors go to stderr, which can be redirected separately
+IS_TTY = sys.stdout.isatty()
+IS_STDERR_TTY = sys.stderr.isatty()
+
+class _Plain:
+    """Stands in for colorama's Fore/Style when output is not a terminal"""
+    def __getattr__(self, name):
+        return ''
+
+Fore, Style = (colorama.Fore, colorama.Style) if IS_TTY else (_Plain(), _Plain())
+
+if IS_TTY or IS_STDERR_TTY:
+    # Initialize colorama for cross-platform colored output. Every colored
+    # string resets itself, so autoreset (which wraps stdout) is not needed
+    colorama.init()
+
+# Message prefixes, shared with the UI
+INF = f"{Fore.BLUE}[INF]{Style.RESET_ALL} "
+SUCCESS = f"{Fore.GREEN}[INF]{Style.RESET_ALL} "
+WRN = f"{Fore.YELLOW}[WRN]{Style.RESET_ALL} "
+ERR = f"{Fore.RED}[ERR]{Style.RESET_ALL} "
+DBG = f"{Fore.MAGENTA}[DBG]{Style.RESET_ALL} "
+
+# Error prefix for stderr, coloured only when stderr itself is a terminal
+_STDERR_ERR = f"{colorama.Fore.RED}[ERR]{colorama.Style.RESET_ALL} " if IS_STDERR_TTY else "[ERR] "
 
 class Logger:
     def __init__(self, verbose=False):
@@ -15,19 +39,19 @@ class Logger:
     
     def info(self, message):
         """Print info message in blue"""
-        print(f"{Fore.BLUE}[INF]{Style.RESET_ALL} {message}")
+        print(f"{INF}{message}")
     
     def success(self, message):
         """Print success message in green"""
-        print(f"{Fore.GREEN}[INF]{Style.RESET_ALL} {message}")
+        print(f"{SUCCESS}{message}")
     
     def warn(self, message):
         """Print warning message in yellow"""
-        print(f"{Fore.YELLOW}[WRN]{Style.RESET_ALL} {message}")
+        print(f"{WRN}{message}")
     
     def error(self, message):
         """Print error message in red"""
-        print(f"{Fore.RED}[ERR]{Style.RESET_ALL} {message}", file=sys.stderr)
+        print(f"{_STDERR_ERR}{message}", file=sys.stderr)
     
     def gray(self, message):
         """Print gray message (for details/explanations)"""
@@ -40,7 +64,7 @@ class Logger:
     def debug(self, message):
         """Print debug message only if verbose mode is enabled"""
         if self.verbose:
-            print(f"{Fore.MAGENTA}[DBG]{Style.RESET_ALL} {message}")
+            print(f"{DBG}{message}")
 
 # Global logger instance
 log = Logger()
@@ -3,11 +3,7 @@
 Enhanced UI utilities for beautiful terminal output
 """
 
-from colorama import Fore, Style, init
-from .logger import log
-
-# Initialize colorama
-init(autoreset=True)
+from .logger import log, Fore, Style, INF, SUCCESS, WRN, ERR
 
 def create_banner(version):
     """Create clean ASCII art banner"""
@@ -36,26 +32,26 @@ def create_results_section(results, duration):
     
     duration_sec = duration / 1000.0
     
-    output = f"\nTarget: {Fore.WHITE}{scanned_dir}{Style.RESET_ALL}\n\n"
+    parts = [f"\nTarget: {Fore.WHITE}{scanned_dir}{Style.RESET_ALL}\n\n"]
     
     if total_issues > 0:
         # Show warnings first
         if bad_deps:
-            output += f"{Fore.YELLOW}[WRN]{Style.RESET_ALL} Found {len(bad_deps)} compromised packages\n"
+            parts.append(f"{WRN}Found {len(bad_deps)} compromised packages\n")
         if suspicious_files:
-            output += f"{Fore.YELLOW}[WRN]{Style.RESET_ALL} Found {len(suspicious_files)} suspicious files\n"
+            parts.append(f"{WRN}Found {len(suspicious_files)} suspicious files\n")
         if git_issues:
-            output += f"{Fore.YELLOW}[WRN]{Style.RESET_ALL} Found {len(git_issues)} git-based threats\n"
+            parts.append(f"{WRN}Found {len(git_issues)} git-based threats\n")
     
     # Always show info
-    output += f"{Fore.BLUE}[INF]{Style.RESET_ALL} Scanned {total_scanned} dependencies in {duration_sec:.1f}s\n"
+    parts.append(f"{INF}Scanned {total_scanned} dependencies in {duration_sec:.1f}s\n")
     
     if total_issues == 0:
-        output += f"{Fore.GREEN}[INF]{Style.RESET_ALL} No security threats detected\n"
+        parts.append(f"{SUCCESS}No security threats detected\n")
     else:
-        output += f"{Fore.RED}[ERR]{Style.RESET_ALL} {total_issues} security issues require attention\n"
+        parts.append(f"{ERR}{total_issues} security issues require attention\n")
     
-    return output
+    return ''.join(parts)
 
 def create_summary(results, duration):
     """Create scan summary in minimal format"""
@@ -73,19 +69,19 @@ def create_summary(results, duration):
     git_was_scanned = git_issues is not None
     git_status = 'skipped' if not git_was_scanned else ('threats found' if git_issues else 'clean')
     
-    output = '\n'
+    parts = ['\n']
     
     # Status
     status_text = 'SECURE' if total_issues == 0 else 'THREATS DETECTED'
     status_color = Fore.GREEN if total_issues == 0 else Fore.RED
-    output += f"{Fore.BLUE}[INF]{Style.RESET_ALL} Security status: {status_color}{status_text}{Style.RESET_ALL}\n"
+    parts.append(f"{INF}Security status: {status_color}{status_text}{Style.RESET_ALL}\n")
     
     # Metrics
-    output += f"{Fore.BLUE}[INF]{Style.RESET_ALL} Dependencies scanned: {total_scanned}\n"
+    parts.append(f"{INF}Dependencies scanned: {total_scanned}\n")
     critical_color = Fore.GREEN if critical_issues == 0 else Fore.RED
-    output += f"{Fore.BLUE}[INF]{Style.RESET_ALL} Critical threats: {critical_color}{critical_issues}{Style.RESET_ALL}\n"
+    parts.append(f"{INF}Critical threats: {critical_color}{critical_issues}{Style.RESET_ALL}\n")
     file_color = Fore.GREEN if file_threats == 0 else Fore.YELLOW
-    output += f"{Fore.BLUE}[INF]{Style.RESET_ALL} File threats: {file_color}{file_threats}{Style.RESET_ALL}\n"
+    parts.append(f"{INF}File threats: {file_color}{file_threats}{Style.RESET_ALL}\n")
     
     if git_status == 'clean':
         git_color = Fore.GREEN
@@ -93,25 +89,25 @@ def create_summary(results, duration):
         git_color = Fore.LIGHTBLACK_EX
     else:
         git_color = Fore.RED
-    output += f"{Fore.BLUE}[INF]{Style.RESET_ALL} Git scan result: {git_color}{git_status}{Style.RESET_ALL}\n"
-    output += f"{Fore.BLUE}[INF]{Style.RESET_ALL} Scan duration: {duration_sec:.1f}s\n"
+    parts.append(f"{INF}Git scan result: {git_color}{git_status}{Style.RESET_ALL}\n")
+    parts.append(f"{INF}Scan duration: {duration_sec:.1f}s\n")
     
-    return output
+    return ''.join(parts)
 
 def create_recommendations():
     """Create security recommendations in minimal format"""
-    output = '\n'
-    
-    output += f"{Fore.BLUE}[INF]{Style.RESET_ALL} Security recommendations:\n"
-    output += f"{Fore.BLUE}[INF]{Style.RESET_ALL} - Enable 2FA/MFA on npm & GitHub accounts\n"
-    output += f"{Fore.BLUE}[INF]{Style.RESET_ALL} - Pin exact versions with lockfiles (package-lock.json)\n"
-    output += f"{Fore.BLUE}[INF]{Style.RESET_ALL} - Use integrity hashes for critical dependencies\n"
-    output += f"{Fore.BLUE}[INF]{Style.RESET_ALL} - Run 'npm audit' regularly in your CI/CD pipeline\n"
-    output += f"{Fore.BLUE}[INF]{Style.RESET_ALL} - Consider 'npm ci --ignore-scripts' during security incidents\n"
-    output += f"{Fore.BLUE}[INF]{Style.RESET_ALL} - Monitor dependencies with tools like Dependabot\n"
-    output += f"{Fore.BLUE}[INF]{Style.RESET_ALL} Pro tip: Run this scanner regularly to stay protected!\n"
-    
-    return output
+    parts = ['\n']
+    
+    parts.append(f"{INF}Security recommendations:\n")
+    parts.append(f"{INF}- Enable 2FA/MFA on npm & GitHub accounts\n")
+    parts.append(f"{INF}- Pin exact versions with lockfiles (package-lock.json)\n")
+    parts.append(f"{INF}- Use integrity hashes for critical dependencies\n")
+    parts.append(f"{INF}- Run 'npm audit' regularly in your CI/CD pipeline\n")
+    parts.append(f"{INF}- Consider 'npm ci --ignore-scripts' during security incidents\n")
+    parts.append(f"{INF}- Monitor dependencies with tools like Dependabot\n")
+    parts.append(f"{INF}Pro tip: Run this scanner regularly to stay protected!\n")
+    
+    return ''.join(parts)
 
 def create_threat_details(results):
     """Create minimal threat details (when issues found)"""
@@ -120,25 +116,25 @@ def create_threat_details(results):
     suspicious_scripts = results.get('suspiciousScripts', [])
     git_issues = results.get('gitIssues', [])
     
-    output = ''
+    parts = []
     
     if bad_deps:
-        output += f"{Fore.RED}[ERR]{Style.RESET_ALL} Compromised packages detected:\n"
+        parts.append(f"{ERR}Compromised packages detected:\n")
         for dep in bad_deps:
-            output += f"{Fore.RED}[ERR]{Style.RESET_ALL} - {dep['name']}@{dep['version']}\n"
+            parts.append(f"{ERR}- {dep['name']}@{dep['version']}\n")
         package_names = ' '.join([dep['name'] for dep in bad_deps])
-        output += f"{Fore.YELLOW}[INF]{Style.RESET_ALL} Run: npm uninstall {package_names}\n"
+        parts.append(f"{Fore.YELLOW}[INF]{Style.RESET_ALL} Run: npm uninstall {package_names}\n")
     
     if suspicious_files or suspicious_scripts:
         files = (suspicious_files or []) + (suspicious_scripts or [])
         for file_info in files:
             file_path = file_info.get('path') or file_info.get('name', 'Unknown')
-            output += f"{Fore.YELLOW}[WRN]{Style.RESET_ALL} Suspicious file: {file_path}\n"
+            parts.append(f"{WRN}Suspicious file: {file_path}\n")
     
     if git_issues:
         for issue in git_issues:
             issue_type = issue.get('type') or issue.get('message', 'Unknown issue')
-            output += f"{Fore.YELLOW}[WRN]{Style.RESET_ALL} Git threat: {issue_type}\n"
+            parts.append(f"{WRN}Git threat: {issue_type}\n")
             
             # Add explanations for specific threat types
             explanation = ''
@@ -148,6 +144,6 @@ def create_threat_details(results):
                 explanation = "Recent commits lack GPG signatures, combined with other indicators. Consider enabling commit signing for added security."
             
             if explanation:
-                output += f"  {Fore.LIGHTBLACK_EX}{explanation}{Style.RESET_ALL}\n"
+                parts.append(f"  {Fore.LIGHTBLACK_EX}{explanation}{Style.RESET_ALL}\n")
     
-    return output
+    return ''.join(parts)